@@ -1,38 +1,80 @@
 import os
 import sqlite3
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 import tweepy
 import time
+import heapq
+import random
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
 from datetime import timezone, tzinfo
 import pytz
 from dotenv import load_dotenv
 import logging
+import logging.handlers
+import queue
+import atexit
 import re
+import orjson
 from PyPDF2 import PdfReader
 from io import BytesIO
 
-# Set up logging
-os.makedirs('logs', exist_ok=True)
-logging.basicConfig(
-    level=logging.DEBUG,
-    format='%(asctime)s - %(levelname)s - %(message)s',
-    handlers=[
+logger = logging.getLogger(__name__)
+
+def _configure_logging():
+    """Set up file and console logging for a run (no-op if already configured)."""
+    if logging.getLogger().handlers:
+        return
+    
+    # Records are handed to a background thread so file and console
+    # writes don't block the fetch loop
+    os.makedirs('logs', exist_ok=True)
+    log_queue = queue.Queue(-1)
+    listener = logging.handlers.QueueListener(
+        log_queue,
         logging.FileHandler('logs/contract_tweets.log'),
-        logging.StreamHandler()
-    ]
-)
+        logging.StreamHandler(),
+        respect_handler_level=True
+    )
+    listener.start()
+    atexit.register(listener.stop)
+    logging.basicConfig(
+        level=logging.DEBUG,
+        format='%(asctime)s - %(levelname)s - %(message)s',
+        handlers=[logging.handlers.QueueHandler(log_queue)]
+    )
 
 # Load environment variables
 load_dotenv()
 
+# Shared HTTP session: keep-alive across SAM.gov queries and retry on
+# rate limiting / transient server errors
+_SESSION = requests.Session()
+_SESSION.mount('https://', HTTPAdapter(max_retries=Retry(
+    total=5,
+    backoff_factor=1,
+    status_forcelist=[429, 500, 502, 503, 504],
+    respect_retry_after_header=True
+)))
+_TIMEOUT = (3.05, 30)  # (connect, read) seconds
+
+# Small business set-asides we post about, as SAM.gov typeOfSetAside codes
+SET_ASIDE_TYPES = ['SBA', 'SDVOSBC', '8A', 'HZC', 'VSA', 'WOSB']
+
 def extract_value_from_pdf(pdf_url):
     """Extract contract value from PDF attachment."""
     try:
         # Download PDF content
-        response = requests.get(pdf_url)
+        response = _SESSION.get(pdf_url, timeout=_TIMEOUT)
         response.raise_for_status()
         
+        # SAM.gov download links don't name the file type, so check the content
+        if not response.content.startswith(b'%PDF'):
+            logger.debug('Attachment is not a PDF: %s', pdf_url)
+            return None
+        
         # Read PDF content
         pdf_reader = PdfReader(BytesIO(response.content))
         text = ''
@@ -56,21 +98,40 @@ def extract_value_from_pdf(pdf_url):
                 value_str = match.group(1).replace(',', '')
                 return float(value_str)
         
-        logging.debug(f"No value pattern found in PDF: {pdf_url}")
+        logger.debug('No value pattern found in PDF: %s', pdf_url)
         return None
         
     except Exception as e:
-        logging.error(f"Error extracting value from PDF {pdf_url}: {str(e)}")
+        logger.error('Error extracting value from PDF %s: %s', pdf_url, str(e))
         return None
 
+def extract_value_from_attachments(contract):
+    """Extract contract value from the first PDF attachment that has one."""
+    try:
+        # SAM.gov sends resourceLinks as null or a list of download URLs
+        for attachment in contract.get('resourceLinks') or []:
+            url = attachment if isinstance(attachment, str) else attachment.get('url')
+            if url:
+                pdf_value = extract_value_from_pdf(url)
+                if pdf_value:
+                    return pdf_value
+    except Exception as e:
+        logger.error('Error extracting value from attachments for %s: %s',
+                     contract.get('noticeId', 'Unknown'), str(e))
+    return None
+
 def setup_database():
     """Create SQLite database and contracts table if they don't exist."""
     conn = sqlite3.connect('contracts.db')
     c = conn.cursor()
-    
-    # Drop existing table to update schema
-    c.execute('DROP TABLE IF EXISTS contracts')
-    
+
+    # WAL keeps commits cheap and lets a manual run overlap the cron run
+    c.execute('PRAGMA journal_mode=WAL')
+    c.execute('PRAGMA synchronous=NORMAL')
+    c.execute('PRAGMA busy_timeout=5000')
+    c.execute('PRAGMA cache_size=-20000')  # ~20 MB page cache
+    c.execute('PRAGMA temp_store=MEMORY')
+
     c.execute('''
         CREATE TABLE IF NOT EXISTS contracts (
             id INTEGER PRIMARY KEY AUTOINCREMENT,
@@ -84,17 +145,60 @@ def setup_database():
             url TEXT
         )
     ''')
+    
+    # Keep existing rows; schema changes go through user_version-gated
+    # migrations (version 1 is the table above)
+    version = c.execute('PRAGMA user_version').fetchone()[0]
+    if version < 1:
+        c.execute('PRAGMA user_version = 1')
+    if version < 2:
+        # Tweets already posted per contract, so reruns never repost
+        c.execute('''
+            CREATE TABLE IF NOT EXISTS posted_tweets (
+                contract_id TEXT PRIMARY KEY,
+                tweet_id TEXT,
+                posted_at TEXT
+            )
+        ''')
+        c.execute('PRAGMA user_version = 2')
     conn.commit()
     return conn
 
-def fetch_sam_contracts():
+_INSERT_CONTRACT_SQL = '''
+    INSERT OR IGNORE INTO contracts (contract_id, title, posted_at, value, score, agency, due_date, url)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+'''
+
+def load_seen_contract_ids(conn):
+    """Load the IDs of all previously recorded contracts in one query."""
+    return frozenset(row[0] for row in conn.execute('SELECT contract_id FROM contracts'))
+
+def save_contracts(conn, contracts):
+    """Record ranked contracts in a single transaction, returning how many were new."""
+    posted_at = datetime.now(timezone.utc).isoformat()
+    rows = [
+        (contract['id'], contract['title'], posted_at, contract['value_raw'],
+         contract['score'], contract['agency'], contract['deadline'], contract['url'])
+        for contract in contracts
+    ]
+
+    # One transaction (and one fsync) for the whole batch; the UNIQUE index
+    # on contract_id skips contracts that are already recorded
+    with conn:
+        cursor = conn.executemany(_INSERT_CONTRACT_SQL, rows)
+    new_count = cursor.rowcount
+    logger.info('Saved %d new contracts to the database (%d already recorded)',
+                 new_count, len(rows) - new_count)
+    return new_count
+
+def fetch_sam_contracts(now=None):
     """Fetch and filter contract opportunities from SAM.gov API."""
     api_key = os.getenv('SAM_API_KEY')
     if not api_key:
         raise ValueError("SAM API key not found in environment variables")
 
     # Get date range for the last 24 hours in UTC
-    end_date = datetime.now(timezone.utc)
+    end_date = now or datetime.now(timezone.utc)
     start_date = end_date - timedelta(days=1)
     
     # Format dates as MM/dd/yyyy for SAM.gov API
@@ -111,102 +215,126 @@ def fetch_sam_contracts():
         'api_version': 'v2',
         'postedFrom': posted_from,
         'postedTo': posted_to,
-        'limit': 100,  # Maximum allowed per page
-        'offset': 0,
+        'limit': 1000,  # Maximum allowed per request
         'sortBy': 'relevance',
-        'setAsideType': ['SBA', 'SDVOSB', '8A', 'HUBZone', 'VOSB', 'WOSB'],
         'active': 'true',
         'responseFormat': 'json',
         'status': 'active',
-        'type': ['o', 'p', 'k'],  # Opportunity, Presolicitation, Combined
+        'ptype': ['o', 'p', 'k'],  # Solicitation, Presolicitation, Combined (no award notices)
         'excludeFields': ['description', 'award']  # Reduce response size
     }
     
-    logging.info('Searching for contracts between %s and %s', 
+    logger.info('Searching for contracts between %s and %s', 
                  posted_from, posted_to)
 
     try:
         all_opportunities = []
+        seen_ids = set()
         total_fetched = 0
-        max_results = 1000  # Set a reasonable limit
         
-        while total_fetched < max_results:
-            logging.info('Fetching page %d of contract opportunities from SAM.gov', (total_fetched // 100) + 1)
-            params['offset'] = total_fetched
-            
-            response = requests.get(url, headers=headers, params=params)
-            
-            # Log response details for debugging
-            logging.info('SAM.gov API Response Status: %d', response.status_code)
-            
-            if response.status_code != 200:
-                logging.error('SAM.gov API Error Response: %s', response.text)
-                break
-                
-            try:
-                data = response.json()
-                if 'opportunitiesData' not in data:
-                    break
-                    
-                opportunities = data['opportunitiesData']
-                if not opportunities:
-                    break
-                    
-                # Log raw opportunity data for debugging
-                logging.debug('Raw opportunities data: %s', opportunities)
-                
-                # Filter for relevant opportunities
-                filtered_opportunities = []
-                for opp in opportunities:
-                    logging.debug('Processing opportunity: %s', opp)
-                    
-                    if opp.get('active') == 'Yes' and \
-                       opp.get('type') not in ['Award Notice'] and \
-                       any(setaside in ['SBA', 'SDVOSB', '8A', 'HUBZone', 'VOSB', 'WOSB']
-                           for setaside in ([opp.get('typeOfSetAside')] if opp.get('typeOfSetAside') else [])):
-                        filtered_opportunities.append(opp)
-                        logging.debug('Added opportunity to filtered list: %s', opp.get('title'))
-                
-                all_opportunities.extend(filtered_opportunities)
-                total_fetched += len(opportunities)
-                
-                logging.info('Fetched %d opportunities, %d relevant (total: %d, relevant: %d)', 
-                             len(opportunities), len(filtered_opportunities), 
-                             total_fetched, len(all_opportunities))
-                
-                # If we got less than the limit, we've reached the end
-                if len(opportunities) < params['limit']:
-                    break
-                    
-                # Rate limiting
-                time.sleep(1)
-                
-            except ValueError as e:
-                logging.error('Error parsing SAM.gov API response: %s', str(e))
-                break
+        # SAM.gov accepts a single typeOfSetAside per query, so filter
+        # server-side with one query per set-aside type; a single page of
+        # up to 1000 records is the per-query cap
+        queries = [{**params, 'typeOfSetAside': set_aside} for set_aside in SET_ASIDE_TYPES]
+        
+        with ThreadPoolExecutor(max_workers=len(SET_ASIDE_TYPES)) as executor:
+            pages = list(executor.map(lambda query: _fetch_page(url, headers, query), queries))
         
-        logging.info('Found %d total contract opportunities', total_fetched)
-        logging.info('Found %d relevant small business opportunities', len(all_opportunities))
+        for data in pages:
+            opportunities = (data or {}).get('opportunitiesData') or []
+            total_fetched += len(opportunities)
+            
+            # Merge results, skipping inactive notices and duplicates
+            for opp in opportunities:
+                notice_id = opp.get('noticeId')
+                if opp.get('active') != 'Yes' or (notice_id and notice_id in seen_ids):
+                    continue
+                seen_ids.add(notice_id)
+                all_opportunities.append(opp)
+        
+        logger.info('Found %d total contract opportunities', total_fetched)
+        logger.info('Found %d relevant small business opportunities', len(all_opportunities))
         return all_opportunities
             
     except requests.exceptions.RequestException as e:
-        logging.error('Error fetching contracts: %s', str(e))
+        logger.error('Error fetching contracts: %s', str(e))
         if hasattr(e.response, 'text'):
-            logging.error('Response content: %s', e.response.text)
+            logger.error('Response content: %s', e.response.text)
         return []
     except Exception as e:
-        logging.error('Unexpected error fetching contracts: %s', str(e))
+        logger.error('Unexpected error fetching contracts: %s', str(e))
         return []
 
-def rank_contracts(contracts):
+def _fetch_page(url, headers, params):
+    """Fetch one page of SAM.gov search results, returning None on error."""
+    logger.info('Fetching %s set-aside opportunities from SAM.gov', params['typeOfSetAside'])
+    
+    try:
+        response = _SESSION.get(url, headers=headers, params=params, timeout=_TIMEOUT)
+    except requests.exceptions.RequestException as e:
+        logger.error('Error fetching %s set-aside opportunities: %s', params['typeOfSetAside'], str(e))
+        return None
+    
+    # Log response details for debugging
+    logger.info('SAM.gov API Response Status: %d', response.status_code)
+    
+    if response.status_code != 200:
+        logger.error('SAM.gov API Error Response: %s', response.text)
+        return None
+        
+    try:
+        data = orjson.loads(response.content)
+    except ValueError as e:
+        logger.error('Error parsing SAM.gov API response: %s', str(e))
+        return None
+    
+    # Log raw opportunity data for debugging
+    opportunities = data.get('opportunitiesData') or []
+    logger.debug('Raw opportunities data: %s', opportunities)
+    
+    # Each query is a single request, so anything past the limit is dropped
+    if data.get('totalRecords', 0) > len(opportunities):
+        logger.warning('Only %d of %d %s set-aside opportunities fetched; the rest were cut off',
+                       len(opportunities), data['totalRecords'], params['typeOfSetAside'])
+    return data
+
+# Set-aside score (0-20 points) by typeOfSetAside code
+_SET_ASIDE_SCORES = {
+    'SDVOSBC': 20, # Service Disabled Veteran Owned
+    'WOSB': 20,    # Women Owned
+    '8A': 15,      # 8(a) Program
+    'HZC': 15,     # HUBZone
+    'VSA': 15,     # Veteran Owned
+    'SBA': 10      # Small Business
+}
+
+def rank_contracts(contracts, now=None):
     """Rank contracts based on value, deadline, and small business relevance."""
-    valid_contracts = []
-    now = datetime.now(timezone.utc)
+    scored_contracts = []
+    now = now or datetime.now(timezone.utc)
     
+    # Downloading attachments dominates ranking time, so fetch the PDFs for
+    # contracts without a value in the API data concurrently up front
+    needs_pdf = [
+        contract for contract in contracts
+        if not (contract.get('award') and contract['award'].get('amount'))
+        and not contract.get('fundingCeiling')
+        and not contract.get('estimatedTotalContractValue')
+    ]
+    pdf_values = {}
+    if needs_pdf:
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            pdf_values = dict(zip(map(id, needs_pdf),
+                                  executor.map(extract_value_from_attachments, needs_pdf)))
+    
+    # Score every contract, keeping only what ranking needs; display
+    # fields are built for the top 5 afterwards
     for contract in contracts:
         try:
-            # Track missing fields for debugging
-            missing_fields = []
+            # Title is required for display
+            if 'title' not in contract:
+                logger.warning('Skipping contract %s with no title', contract.get('noticeId', 'Unknown'))
+                continue
             
             # Get contract value (try multiple sources)
             value = None
@@ -223,24 +351,16 @@ def rank_contracts(contracts):
                 value = float(contract['estimatedTotalContractValue'])
                 value_source = 'estimatedTotalContractValue'
             
-            # If no value found, try PDF attachments
-            if value is None:
-                attachments = contract.get('resourceLinks', [])
-                for attachment in attachments:
-                    if attachment.get('url', '').lower().endswith('.pdf'):
-                        pdf_value = extract_value_from_pdf(attachment['url'])
-                        if pdf_value:
-                            value = pdf_value
-                            value_source = 'PDF extraction'
-                            break
+            # If no value found, use the one extracted from PDF attachments
+            if value is None and pdf_values.get(id(contract)):
+                value = pdf_values[id(contract)]
+                value_source = 'PDF extraction'
             
             # Log value source and handle missing values
             if value is not None:
-                logging.info(f"Contract value (${value:,.2f}) found in {value_source}")
+                logger.info('Contract value ($%.2f) found in %s', value, value_source)
             else:
-                value = 'Est. Value: Pending Review'
-                missing_fields.append('contract_value')
-                logging.warning(f"No contract value found in API or PDFs - manual review needed for {contract.get('noticeId', 'Unknown')}")
+                logger.warning('No contract value found in API or PDFs - manual review needed for %s', contract.get('noticeId', 'Unknown'))
             
             # Parse response deadline
             deadline_str = contract.get('responseDeadLine')
@@ -249,13 +369,15 @@ def rank_contracts(contracts):
             if deadline_str:
                 try:
                     deadline = datetime.fromisoformat(deadline_str)
+                    # SAM.gov deadlines carry the agency's local offset; skip the
+                    # conversion when the offset is already UTC
                     if deadline.tzinfo is None:
                         deadline = deadline.replace(tzinfo=timezone.utc)
-                    else:
+                    elif deadline.tzinfo is not timezone.utc:
                         deadline = deadline.astimezone(timezone.utc)
                     days_until_due = (deadline - now).days
                 except ValueError:
-                    logging.warning(f"Could not parse deadline: {deadline_str}")
+                    logger.warning('Could not parse deadline: %s', deadline_str)
 
             # Skip if deadline has passed
             if days_until_due is not None and days_until_due < 0:
@@ -274,96 +396,94 @@ def rank_contracts(contracts):
             
             # Set-aside score (0-20 points) - Adjusted weights
             set_aside = contract.get('typeOfSetAside', '')
-            set_aside_score = {
-                'SDVOSB': 20,  # Service Disabled Veteran Owned
-                'WOSB': 20,   # Women Owned
-                '8A': 15,     # 8(a) Program
-                'HUBZone': 15,# HUBZone
-                'VOSB': 15,   # Veteran Owned
-                'SBA': 10     # Small Business
-            }.get(set_aside, 0)
+            set_aside_score = _SET_ASIDE_SCORES.get(set_aside, 0)
             
             final_score = value_score + urgency_score + set_aside_score
-            
-            # Generate a unique ID from title and date if no ID exists
-            contract_id = contract.get('id') or contract.get('noticeId') or f"{contract['title']}_{deadline.strftime('%Y%m%d')}"
-            
-            # Format deadline for display
-            deadline_display = 'Pending'
-            if deadline:
-                deadline_display = deadline.strftime('%B %d, %Y, %I:%M %p %Z')
-            
-            # Format value for display
-            value_display = 'Pending Award Estimate'
-            if value:
-                value_display = '${:,.2f}'.format(value)
-            
-            # Get set-aside description
-            set_aside_desc = contract.get('typeOfSetAsideDescription') or contract.get('typeOfSetAside', 'Open Competition')
-            if set_aside_desc == '':
-                set_aside_desc = 'Open Competition'
-                missing_fields.append('set_aside')
-            
-            # Get agency name
-            agency_path = contract.get('fullParentPathName', '').split('.')
-            agency = agency_path[-1] if agency_path else 'Federal Government'
-            if not agency_path:
-                missing_fields.append('agency')
-                
-            # Get NAICS code
-            naics_code = contract.get('naicsCode', 'Not Specified')
-            if not naics_code:
-                missing_fields.append('naics_code')
-                
-            # Get place of performance
-            pop = contract.get('placeOfPerformance', {})
-            location = 'Multiple Locations'
-            if pop:
-                state = pop.get('state', '')
-                city = pop.get('city', '')
-                if city and state:
-                    location = f"{city}, {state}"
-                elif state:
-                    location = state
-            else:
-                missing_fields.append('place_of_performance')
-            
-            # Log any missing fields
-            if missing_fields:
-                logging.warning(f"Missing fields for contract {contract.get('noticeId', 'Unknown')}: {', '.join(missing_fields)}")
-
-            valid_contracts.append({
-                'id': contract.get('noticeId', f"{contract['title']}_{int(time.time())}"),
-                'title': contract['title'],
-                'deadline': deadline_display,
-                'agency': agency,
-                'url': contract.get('uiLink', ''),
-                'set_aside': set_aside_desc,
-                'value': value_display,
-                'naics': naics_code,
-                'location': location,
-                'score': final_score,
-                'value_raw': value or 0,  # Store raw value for sorting
-                'missing_fields': missing_fields
-            })
+            scored_contracts.append((final_score, contract, value, deadline))
             
         except (ValueError, KeyError) as e:
-            logging.warning('Error processing contract %s: %s', 
+            logger.warning('Error processing contract %s: %s', 
                           contract.get('title', 'Unknown'), str(e))
-            logging.debug('Contract data: %s', contract)
+            logger.debug('Contract data: %s', contract)
             continue
     
-    if not valid_contracts:
-        logging.warning('No valid contracts to rank')
+    if not scored_contracts:
+        logger.warning('No valid contracts to rank')
         return []
     
-    # Sort by score (descending)
-    ranked_contracts = sorted(valid_contracts, key=lambda x: x['score'], reverse=True)
-    logging.info('Ranked %d contracts, returning top 5', len(ranked_contracts))
-    return ranked_contracts[:5]  # Return top 5 contracts
+    # Select the top 5 by score (descending) without sorting the rest
+    logger.info('Ranked %d contracts, returning top 5', len(scored_contracts))
+    top_contracts = heapq.nlargest(5, scored_contracts, key=lambda x: x[0])
+    return [_format_ranked_contract(*scored) for scored in top_contracts]
+
+def _format_ranked_contract(score, contract, value, deadline):
+    """Build the display record for a ranked contract."""
+    # Track missing fields for debugging
+    missing_fields = []
+    if value is None:
+        missing_fields.append('contract_value')
+    
+    # Format deadline for display
+    deadline_display = 'Pending'
+    if deadline:
+        deadline_display = deadline.strftime('%B %d, %Y, %I:%M %p %Z')
+    
+    # Format value for display
+    value_display = 'Pending Award Estimate'
+    if value:
+        value_display = '${:,.2f}'.format(value)
+    
+    # Get set-aside description
+    set_aside_desc = contract.get('typeOfSetAsideDescription') or contract.get('typeOfSetAside', 'Open Competition')
+    if set_aside_desc == '':
+        set_aside_desc = 'Open Competition'
+        missing_fields.append('set_aside')
+    
+    # Get agency name
+    agency = contract.get('fullParentPathName', '').rpartition('.')[2]
+    if not agency:
+        agency = 'Federal Government'
+        missing_fields.append('agency')
+        
+    # Get NAICS code
+    naics_code = contract.get('naicsCode', 'Not Specified')
+    if not naics_code:
+        missing_fields.append('naics_code')
+        
+    # Get place of performance
+    pop = contract.get('placeOfPerformance', {})
+    location = 'Multiple Locations'
+    if pop:
+        state = pop.get('state', '')
+        city = pop.get('city', '')
+        if city and state:
+            location = f"{city}, {state}"
+        elif state:
+            location = state
+    else:
+        missing_fields.append('place_of_performance')
+    
+    # Log any missing fields
+    if missing_fields:
+        logger.warning('Missing fields for contract %s: %s', contract.get('noticeId', 'Unknown'), ', '.join(missing_fields))
+
+    return {
+        'id': contract.get('noticeId', f"{contract['title']}_{int(time.time())}"),
+        'title': contract['title'],
+        'deadline': deadline_display,
+        'agency': agency,
+        'url': contract.get('uiLink', ''),
+        'set_aside': set_aside_desc,
+        'value': value_display,
+        'naics': naics_code,
+        'location': location,
+        'score': score,
+        'value_raw': value or 0,  # Store raw value for sorting
+        'missing_fields': missing_fields
+    }
 
 def setup_twitter():
-    """Initialize Twitter API v2 client with error handling and verification."""
+    """Initialize Twitter API v2 client, verifying credentials only if VERIFY_TWITTER_CREDS is set."""
     try:
         client = tweepy.Client(
             consumer_key=os.getenv('TWITTER_API_KEY'),
@@ -372,31 +492,64 @@ def setup_twitter():
             access_token_secret=os.getenv('TWITTER_ACCESS_SECRET')
         )
         
-        # Test the client by getting the authenticated user
-        client.get_me()
-        logging.info('✅ Twitter authentication successful!')
+        # Verifying costs a request against the rate window, so only test
+        # the client by getting the authenticated user when asked to; bad
+        # credentials otherwise surface on the first post
+        if os.getenv('VERIFY_TWITTER_CREDS'):
+            client.get_me()
+            logger.info('✅ Twitter authentication successful!')
         return client
     except Exception as e:
-        logging.error('❌ Twitter authentication failed: %s', str(e))
+        logger.error('❌ Twitter authentication failed: %s', str(e))
         raise
 
+# Hashtags by set-aside type, keyed by upper-case code
+_SET_ASIDE_HASHTAGS = {
+    'SDVOSB': '#SDVOSB #VeteranOwned',
+    'WOSB': '#WOSB #WomenOwned',
+    '8A': '#8a #SmallBusiness',
+    'HUBZONE': '#HUBZone #SmallBusiness',
+    'HZC': '#HUBZone #SmallBusiness',
+    'VOSB': '#VOSB #VeteranOwned',
+    'VSA': '#VOSB #VeteranOwned',
+    'SBA': '#SmallBusiness'
+}
+_SET_ASIDE_HASHTAG_RE = re.compile('|'.join(_SET_ASIDE_HASHTAGS), re.IGNORECASE)
+
+# Twitter counts every URL as 23 characters and any code point outside
+# these ranges (emoji, CJK) as 2 toward the 280 limit
+_TWEET_URL_RE = re.compile(r'https?://\S+')
+_TWEET_URL_LENGTH = 23
+_TWEET_LIGHT_RANGES = ((0, 4351), (8192, 8205), (8208, 8223), (8242, 8247))
+
+def _char_weight(char):
+    """Weight of one character toward Twitter's length limit."""
+    code = ord(char)
+    return 1 if any(low <= code <= high for low, high in _TWEET_LIGHT_RANGES) else 2
+
+def _tweet_length(text):
+    """Length of text as Twitter counts it toward the 280 limit."""
+    urls = len(_TWEET_URL_RE.findall(text))
+    return sum(map(_char_weight, _TWEET_URL_RE.sub('', text))) + urls * _TWEET_URL_LENGTH
+
+def _truncate_to_weight(text, budget):
+    """Cut text to a weighted length budget, marking the cut with '...' when it fits."""
+    if sum(map(_char_weight, text)) <= budget:
+        return text
+    ellipsis = '...' if budget >= 3 else ''
+    room = budget - len(ellipsis)
+    used = 0
+    for i, char in enumerate(text):
+        used += _char_weight(char)
+        if used > room:
+            return text[:i] + ellipsis
+    return text
+
 def format_tweet(contract):
     """Format contract details into an engaging tweet under 280 characters."""
-    # Get hashtags based on set-aside type
-    set_aside_hashtags = {
-        'SDVOSB': '#SDVOSB #VeteranOwned',
-        'WOSB': '#WOSB #WomenOwned',
-        '8A': '#8a #SmallBusiness',
-        'HUBZone': '#HUBZone #SmallBusiness',
-        'VOSB': '#VOSB #VeteranOwned',
-        'SBA': '#SmallBusiness'
-    }
-
-    # Get set-aside type from description
-    set_aside = contract.get('set_aside', '')
-    hashtags = set_aside_hashtags.get(
-        next((k for k in set_aside_hashtags.keys() if k in set_aside.upper()), 'SBA')
-    )
+    # Get hashtags based on set-aside type from description
+    match = _SET_ASIDE_HASHTAG_RE.search(contract.get('set_aside', ''))
+    hashtags = _SET_ASIDE_HASHTAGS[match.group(0).upper() if match else 'SBA']
     
     tweet = (
         f"🚨 NEW FEDERAL CONTRACT\n\n"
@@ -408,146 +561,155 @@ def format_tweet(contract):
         f"#GovContracts {hashtags}"
     )
     
-    # Ensure tweet is under 280 characters
-    if len(tweet) > 280:
-        # Truncate title if needed
-        title = contract['title']
-        if len(title) > 50:
-            title = title[:47] + "..."
-            
-        tweet = (
-            f"🚨 FEDERAL CONTRACT\n"
-            f"📋 {title}\n"
-            f"⏳ {contract['deadline']}\n"
+    # Ensure tweet is under 280 characters as Twitter counts them
+    if _tweet_length(tweet) > 280:
+        # Use the compact layout, giving the title whatever room the
+        # other fields leave
+        head = "🚨 FEDERAL CONTRACT\n📋 "
+        tail = (
+            f"\n⏳ {contract['deadline']}\n"
             f"🏢 {contract['agency']}\n"
             f"🔗 {contract['url']}\n"
             f"#GovContracts {hashtags}"
         )
+        budget = 280 - _tweet_length(head) - _tweet_length(tail)
+
+        # A very long agency name can leave no room at all; shorten it too
+        if budget < 0:
+            agency = contract['agency']
+            short_agency = _truncate_to_weight(agency, max(0, sum(map(_char_weight, agency)) + budget))
+            tail = tail.replace(f"🏢 {agency}\n", f"🏢 {short_agency}\n", 1)
+            budget = 280 - _tweet_length(head) - _tweet_length(tail)
+
+        # Truncate title if needed
+        title = _truncate_to_weight(contract['title'], max(0, budget))
+        tweet = head + title + tail
     
     return tweet
 
-def post_contract_tweet(twitter_client, contract):
-    """Post a contract opportunity to Twitter with retries."""
+def _retry_delay(error, attempt):
+    """Seconds to wait before retrying a tweet, honoring Twitter's rate limit reset."""
+    if isinstance(error, tweepy.TooManyRequests):
+        reset = error.response.headers.get('x-rate-limit-reset')
+        if reset:
+            return max(1, int(reset) - int(time.time()))
+    # Exponential backoff with jitter; three attempts wait 1s then 2s, capped at 8s
+    return min(8, 2 ** (attempt - 1)) + random.uniform(0, 1)
+
+def post_contract_tweet(twitter_client, contract, conn=None):
+    """Post a contract opportunity to Twitter with retries.
+    
+    If a database connection is given, contracts already posted are skipped
+    and successful posts are recorded in the posted_tweets table.
+    """
+    if conn is not None:
+        row = conn.execute('SELECT tweet_id FROM posted_tweets WHERE contract_id = ?',
+                           (contract['id'],)).fetchone()
+        if row:
+            logger.info('Contract %s already posted as tweet %s, skipping', contract['id'], row[0])
+            return True
+    
     max_retries = 3
     retry_count = 0
+    tweet_text = format_tweet(contract)
     
     while retry_count < max_retries:
         try:
-            tweet_text = format_tweet(contract)
-            logging.info('Attempting to post tweet: %s', tweet_text)
+            logger.info('Attempting to post tweet: %s', tweet_text)
             response = twitter_client.create_tweet(text=tweet_text)
             
             if response.data:
-                logging.info('Successfully posted tweet with ID: %s', response.data['id'])
-                return True
+                logger.info('Successfully posted tweet with ID: %s', response.data['id'])
+                break
             else:
                 raise Exception('No tweet data in response')
                 
+        except (tweepy.Unauthorized, tweepy.Forbidden) as e:
+            # Bad credentials or a rejected tweet won't succeed on retry
+            logger.error('Tweet rejected, not retrying: %s', str(e))
+            if isinstance(e, tweepy.Unauthorized):
+                logger.error('❌ Twitter authentication failed - check the TWITTER_* credentials')
+            return False
         except Exception as e:
             retry_count += 1
             if retry_count < max_retries:
-                logging.warning('Tweet attempt %d failed: %s. Retrying...', retry_count, str(e))
-                time.sleep(5)  # Wait 5 seconds before retrying
+                delay = _retry_delay(e, retry_count)
+                logger.warning('Tweet attempt %d failed: %s. Retrying in %.1f seconds...', retry_count, str(e), delay)
+                time.sleep(delay)
             else:
-                logging.error('Failed to post tweet after %d attempts: %s', max_retries, str(e))
+                logger.error('Failed to post tweet after %d attempts: %s', max_retries, str(e))
                 return False
+    
+    # The tweet is live, so a failure to record it must not trigger a repost
+    if conn is not None:
+        try:
+            with conn:
+                conn.execute(
+                    'INSERT OR IGNORE INTO posted_tweets (contract_id, tweet_id, posted_at) VALUES (?, ?, ?)',
+                    (contract['id'], response.data['id'], datetime.now(timezone.utc).isoformat())
+                )
+        except sqlite3.Error as e:
+            logger.error('Error recording tweet %s for contract %s: %s', response.data['id'], contract['id'], str(e))
+    return True
 
 def main():
     """Main function to fetch and rank contracts (without posting to Twitter)."""
+    _configure_logging()
+    conn = None
     try:
-        # Fetch and rank contracts
-        logging.info('Fetching contracts from SAM.gov')
-        contracts = fetch_sam_contracts()
+        # Fetch and rank contracts against a single run timestamp
+        run_now = datetime.now(timezone.utc)
+        logger.info('Fetching contracts from SAM.gov')
+        contracts = fetch_sam_contracts(run_now)
+        
+        if not contracts:
+            logger.warning('No contracts found')
+            return
+        
+        # Drop contracts recorded on earlier runs before ranking them
+        conn = setup_database()
+        seen_ids = load_seen_contract_ids(conn)
+        contracts = [contract for contract in contracts if contract.get('noticeId') not in seen_ids]
         
         if not contracts:
-            logging.warning('No contracts found')
+            logger.warning('No new contracts found')
             return
         
         # Rank contracts
-        logging.info('Ranking contracts')
-        ranked_contracts = rank_contracts(contracts)
+        logger.info('Ranking contracts')
+        ranked_contracts = rank_contracts(contracts, now=run_now)
         
         if not ranked_contracts:
-            logging.warning('No contracts met ranking criteria')
+            logger.warning('No contracts met ranking criteria')
             return
             
-        logging.info('Found %d ranked contracts', len(ranked_contracts))
+        logger.info('Found %d ranked contracts', len(ranked_contracts))
+        
+        # Record ranked contracts
+        save_contracts(conn, ranked_contracts)
         
         # Display top 5 contracts
-        logging.info('Top 5 Contracts:')
+        logger.info('Top 5 Contracts:')
         for i, contract in enumerate(ranked_contracts[:5], 1):
-            # Extract agency from fullParentPathName or department
-            agency_path = contract.get('fullParentPathName', '').split('/')
-            agency = agency_path[-1] if agency_path else contract.get('department', 'N/A')
-            
-            # Format response date
-            response_date = contract.get('responseDate')
-            if response_date:
-                try:
-                    date_obj = datetime.strptime(response_date, '%Y-%m-%dT%H:%M:%S.%f%z')
-                    formatted_date = date_obj.strftime('%Y-%m-%d %H:%M %Z')
-                except ValueError:
-                    formatted_date = response_date
-            else:
-                formatted_date = 'N/A'
-            
-            # Format contract value
-            value = contract.get('estimatedTotalContractValue')
-            if value:
-                try:
-                    value_float = float(value)
-                    formatted_value = '${:,.2f}'.format(value_float)
-                except ValueError:
-                    formatted_value = f'${value}'
-            else:
-                formatted_value = 'N/A'
-            
-            # Get set-aside description or type
-            set_aside = contract.get('typeOfSetAsideDescription') or contract.get('typeOfSetAside', 'None')
-            
-            # Get contract value
-            value = contract.get('estimatedTotalContractValue')
-            if not value and contract.get('award'):
-                value = contract['award'].get('amount')
-            if value:
-                try:
-                    value_float = float(value)
-                    formatted_value = '${:,.2f}'.format(value_float)
-                except ValueError:
-                    formatted_value = f'${value}'
-            else:
-                formatted_value = 'N/A'
-            
-            # Format response date
-            response_date = contract.get('responseDeadLine')
-            if response_date:
-                try:
-                    date_obj = datetime.strptime(response_date, '%Y-%m-%dT%H:%M:%S%z')
-                    formatted_date = date_obj.strftime('%Y-%m-%d %H:%M %Z')
-                except ValueError:
-                    formatted_date = response_date
-            else:
-                formatted_date = 'N/A'
-            
-            # Get agency name
-            agency_path = contract.get('fullParentPathName', '').split('.')
-            agency = agency_path[-1] if agency_path else contract.get('department', 'N/A')
-            
-            # Get notice ID
-            notice_id = contract.get('noticeId', 'N/A')
-            
-            logging.info('\n%d. %s', i, contract['title'])
-            logging.info('   💰 Contract Value: %s', contract['value'])
-            logging.info('   📅 Response Due: %s', contract['deadline'])
-            logging.info('   🏢 Agency: %s', contract['agency'])
-            logging.info('   🎯 Set-Aside: %s', contract['set_aside'])
-            logging.info('   📊 Score: %.2f', contract['score'])
-            logging.info('   🔗 URL: %s', contract['url'])
+            logger.info('\n%d. %s', i, contract['title'])
+            logger.info('   💰 Contract Value: %s', contract['value'])
+            logger.info('   📅 Response Due: %s', contract['deadline'])
+            logger.info('   🏢 Agency: %s', contract['agency'])
+            logger.info('   🎯 Set-Aside: %s', contract['set_aside'])
+            logger.info('   📊 Score: %.2f', contract['score'])
+            logger.info('   🔗 URL: %s', contract['url'])
             
     except Exception as e:
-        logging.error('Error in main function: %s', str(e))
+        logger.error('Error in main function: %s', str(e))
     finally:
-        logging.info('Finished processing contracts')
+        if conn is not None:
+            try:
+                conn.execute('PRAGMA optimize')  # Refresh query planner stats
+            except sqlite3.Error as e:
+                logger.error('Error optimizing database: %s', str(e))
+            finally:
+                conn.close()
+        logger.info('Finished processing contracts')
 
 
 
@@ -0,0 +1,53 @@
+import pytest
+from contract_tweets import setup_database
+
+@pytest.fixture
+def make_contract():
+    """Build a ranked contract record as rank_contracts returns it."""
+    def make(**overrides):
+        contract = {
+            'id': 'abc123',
+            'title': 'Janitorial Services for Federal Building',
+            'deadline': '2026-11-01 05:00 PM EDT',
+            'agency': 'PUBLIC BUILDINGS SERVICE',
+            'url': 'https://sam.gov/opp/abc123/view',
+            'set_aside': 'Total Small Business Set-Aside (FAR 19.5)',
+            'value': '$250,000',
+            'naics': '561720',
+            'location': 'Denver, CO',
+            'score': 42.5,
+            'value_raw': 250000.0,
+            'missing_fields': [],
+        }
+        contract.update(overrides)
+        return contract
+    return make
+
+@pytest.fixture
+def conn(tmp_path, monkeypatch):
+    """Open a fresh contracts.db in a temporary directory."""
+    monkeypatch.chdir(tmp_path)
+    conn = setup_database()
+    yield conn
+    conn.close()
+
+@pytest.fixture
+def make_notice():
+    """Build a SAM.gov opportunity record as fetch_sam_contracts returns it."""
+    def make(**overrides):
+        notice = {
+            'noticeId': 'abc123',
+            'title': 'Janitorial Services for Federal Building',
+            'active': 'Yes',
+            'responseDeadLine': '2026-11-01T17:00:00-04:00',
+            'fullParentPathName': 'GENERAL SERVICES ADMINISTRATION.PUBLIC BUILDINGS SERVICE',
+            'typeOfSetAside': 'SBA',
+            'typeOfSetAsideDescription': 'Total Small Business Set-Aside (FAR 19.5)',
+            'naicsCode': '561720',
+            'uiLink': 'https://sam.gov/opp/abc123/view',
+            'award': {'amount': '250000'},
+            'resourceLinks': None,
+        }
+        notice.update(overrides)
+        return notice
+    return make
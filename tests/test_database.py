@@ -0,0 +1,19 @@
+from contract_tweets import save_contracts, setup_database
+
+# Test contracts are recorded once
+def test_save_contracts_counts_only_new(conn, make_contract):
+    contracts = [make_contract(), make_contract(id='def456')]
+    assert save_contracts(conn, contracts) == 2
+    assert save_contracts(conn, contracts + [make_contract(id='ghi789')]) == 1
+    assert conn.execute('SELECT COUNT(*) FROM contracts').fetchone()[0] == 3
+
+# Test recorded rows survive reopening the database
+def test_setup_database_keeps_existing_rows(conn, make_contract):
+    save_contracts(conn, [make_contract()])
+    conn.close()
+    reopened = setup_database()
+    try:
+        assert reopened.execute('SELECT contract_id FROM contracts').fetchall() == [('abc123',)]
+        assert reopened.execute('PRAGMA user_version').fetchone()[0] == 2
+    finally:
+        reopened.close()
@@ -0,0 +1,43 @@
+import orjson
+import pytest
+import requests
+import contract_tweets
+from contract_tweets import _fetch_page, fetch_sam_contracts
+
+class FakeResponse:
+    def __init__(self, data, status_code=200):
+        self.status_code = status_code
+        self.content = orjson.dumps(data)
+        self.text = self.content.decode()
+
+def fake_search(failing_set_aside=None, total_records=1):
+    """Stand-in for _SESSION.get returning one notice per set-aside query."""
+    def get(url, headers=None, params=None, timeout=None):
+        set_aside = params['typeOfSetAside']
+        if set_aside == failing_set_aside:
+            raise requests.exceptions.ConnectionError('connection refused')
+        notice = {'noticeId': set_aside, 'title': set_aside, 'active': 'Yes'}
+        return FakeResponse({'totalRecords': total_records, 'opportunitiesData': [notice]})
+    return get
+
+@pytest.fixture(autouse=True)
+def api_key(monkeypatch):
+    monkeypatch.setenv('SAM_API_KEY', 'test-key')
+
+# Test a failed set-aside query doesn't discard the others
+def test_fetch_page_request_error_returns_none(monkeypatch):
+    monkeypatch.setattr(contract_tweets._SESSION, 'get', fake_search('SBA'))
+    params = {'limit': 1000, 'typeOfSetAside': 'SBA'}
+    assert _fetch_page('https://api.sam.gov/opportunities/v2/search', {}, params) is None
+
+def test_fetch_sam_contracts_keeps_other_set_asides(monkeypatch):
+    monkeypatch.setattr(contract_tweets._SESSION, 'get', fake_search('HZC'))
+    notice_ids = {notice['noticeId'] for notice in fetch_sam_contracts()}
+    assert notice_ids == set(contract_tweets.SET_ASIDE_TYPES) - {'HZC'}
+
+# Test a query cut off at the limit is reported
+def test_fetch_page_warns_when_results_are_cut_off(monkeypatch, caplog):
+    monkeypatch.setattr(contract_tweets._SESSION, 'get', fake_search(total_records=1500))
+    params = {'limit': 1000, 'typeOfSetAside': 'WOSB'}
+    assert _fetch_page('https://api.sam.gov/opportunities/v2/search', {}, params) is not None
+    assert 'Only 1 of 1500 WOSB set-aside opportunities fetched' in caplog.text
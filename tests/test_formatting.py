@@ -0,0 +1,48 @@
+import pytest
+from contract_tweets import SET_ASIDE_TYPES, _SET_ASIDE_SCORES, _tweet_length, format_tweet
+
+# Test tweets fit Twitter's weighted 280 character limit
+@pytest.mark.parametrize('overrides', [
+    {},
+    {'title': 'Facilities Maintenance ' * 20},
+    {'title': '施設保守サービス' * 40},
+    {'title': '🏗️' * 200, 'url': 'https://sam.gov/opp/' + 'x' * 300 + '/view'},
+    {'agency': 'A' * 300},
+])
+def test_format_tweet_fits_weighted_limit(make_contract, overrides):
+    assert _tweet_length(format_tweet(make_contract(**overrides))) <= 280
+
+def test_format_tweet_truncates_long_title(make_contract):
+    tweet = format_tweet(make_contract(title='Facilities Maintenance ' * 20))
+    assert '...' in tweet
+    assert 'https://sam.gov/opp/abc123/view' in tweet
+
+@pytest.mark.parametrize('text, expected', [
+    ('abc', 3),
+    ('🚨', 2),
+    ('施設', 4),
+    ('🔗 https://sam.gov/opp/' + 'x' * 100, 2 + 1 + 23),
+])
+def test_tweet_length(text, expected):
+    assert _tweet_length(text) == expected
+
+# Test set-aside codes map to their scores and hashtags
+def test_set_aside_types_are_scored():
+    assert set(SET_ASIDE_TYPES) == set(_SET_ASIDE_SCORES)
+
+@pytest.mark.parametrize('code, hashtags', [
+    ('SDVOSBC', '#SDVOSB #VeteranOwned'),
+    ('HZC', '#HUBZone #SmallBusiness'),
+    ('VSA', '#VOSB #VeteranOwned'),
+    ('8A', '#8a #SmallBusiness'),
+])
+def test_format_tweet_hashtags_from_set_aside_code(make_contract, code, hashtags):
+    assert format_tweet(make_contract(set_aside=code)).endswith('#GovContracts ' + hashtags)
+
+@pytest.mark.parametrize('set_aside, hashtags', [
+    ('Historically Underutilized Business (HUBZone) Set-Aside (FAR 19.13)', '#HUBZone #SmallBusiness'),
+    ('Women-Owned Small Business (WOSB) Program Set-Aside (FAR 19.15)', '#WOSB #WomenOwned'),
+    ('Open Competition', '#SmallBusiness'),
+])
+def test_format_tweet_hashtags_from_set_aside_description(make_contract, set_aside, hashtags):
+    assert format_tweet(make_contract(set_aside=set_aside)).endswith('#GovContracts ' + hashtags)
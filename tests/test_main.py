@@ -0,0 +1,26 @@
+import contract_tweets
+
+# Test contracts recorded on an earlier run are skipped before ranking
+def test_main_skips_recorded_contracts(tmp_path, monkeypatch, make_notice):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(contract_tweets, '_configure_logging', lambda: None)
+    untracked = make_notice(title='Grounds Maintenance')
+    del untracked['noticeId']
+    notices = [make_notice(noticeId='abc123'), make_notice(noticeId='def456'), untracked]
+    monkeypatch.setattr(contract_tweets, 'fetch_sam_contracts', lambda now: list(notices))
+
+    ranked_titles = []
+    rank_contracts = contract_tweets.rank_contracts
+    def record_ranked(contracts, now=None):
+        ranked_titles.append(sorted(contract['title'] for contract in contracts))
+        return rank_contracts(contracts, now)
+    monkeypatch.setattr(contract_tweets, 'rank_contracts', record_ranked)
+
+    contract_tweets.main()
+    contract_tweets.main()
+
+    # Records without a noticeId get a title_timestamp id and never match
+    assert ranked_titles == [
+        sorted(notice['title'] for notice in notices),
+        ['Grounds Maintenance'],
+    ]
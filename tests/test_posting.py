@@ -0,0 +1,80 @@
+import sqlite3
+import pytest
+import requests
+import tweepy
+from contract_tweets import _retry_delay, post_contract_tweet
+
+def make_response(status_code, headers=None):
+    response = requests.Response()
+    response.status_code = status_code
+    response.headers.update(headers or {})
+    return response
+
+# Test rate-limited tweets wait for Twitter's reset time
+def test_retry_delay_honors_rate_limit_reset(monkeypatch):
+    monkeypatch.setattr('contract_tweets.time.time', lambda: 1000000)
+    error = tweepy.TooManyRequests(make_response(429, {'x-rate-limit-reset': '1000060'}))
+    assert _retry_delay(error, 1) == 60
+
+# Test other failures back off exponentially with jitter
+@pytest.mark.parametrize('attempt, base', [(1, 1), (2, 2), (10, 8)])
+def test_retry_delay_backoff(attempt, base):
+    assert base <= _retry_delay(Exception('boom'), attempt) <= base + 1
+
+class FakeClient:
+    """Stand-in for tweepy.Client that records tweets and fails as told."""
+    def __init__(self, *errors):
+        self.errors = list(errors)
+        self.tweets = []
+
+    def create_tweet(self, text):
+        self.tweets.append(text)
+        if self.errors:
+            raise self.errors.pop(0)
+        return tweepy.Response({'id': '999'}, None, None, None)
+
+class FailingInsertConnection:
+    """Wraps a connection so that recording a posted tweet fails."""
+    def __init__(self, conn):
+        self.conn = conn
+
+    def execute(self, sql, params=()):
+        if sql.startswith('INSERT'):
+            raise sqlite3.OperationalError('database is locked')
+        return self.conn.execute(sql, params)
+
+    def __enter__(self):
+        return self.conn.__enter__()
+
+    def __exit__(self, *exc):
+        return self.conn.__exit__(*exc)
+
+@pytest.fixture(autouse=True)
+def no_sleep(monkeypatch):
+    monkeypatch.setattr('contract_tweets.time.sleep', lambda seconds: None)
+
+# Test posted tweets are recorded and never reposted
+def test_post_contract_tweet_records_and_skips_repost(conn, make_contract):
+    client = FakeClient()
+    assert post_contract_tweet(client, make_contract(), conn) is True
+    assert post_contract_tweet(client, make_contract(), conn) is True
+    assert len(client.tweets) == 1
+    row = conn.execute('SELECT tweet_id FROM posted_tweets WHERE contract_id = ?', ('abc123',)).fetchone()
+    assert row == ('999',)
+
+def test_post_contract_tweet_record_failure_does_not_repost(conn, make_contract):
+    client = FakeClient()
+    assert post_contract_tweet(client, make_contract(), FailingInsertConnection(conn)) is True
+    assert len(client.tweets) == 1
+
+# Test rejected tweets aren't retried but other failures are
+@pytest.mark.parametrize('error, status_code', [(tweepy.Unauthorized, 401), (tweepy.Forbidden, 403)])
+def test_post_contract_tweet_does_not_retry_rejections(make_contract, error, status_code):
+    client = FakeClient(error(make_response(status_code)))
+    assert post_contract_tweet(client, make_contract()) is False
+    assert len(client.tweets) == 1
+
+def test_post_contract_tweet_retries_other_failures(make_contract):
+    client = FakeClient(tweepy.TwitterServerError(make_response(503)))
+    assert post_contract_tweet(client, make_contract()) is True
+    assert len(client.tweets) == 2
@@ -0,0 +1,66 @@
+from datetime import datetime, timezone
+
+import contract_tweets
+from contract_tweets import rank_contracts
+
+NOW = datetime(2026, 10, 15, tzinfo=timezone.utc)
+
+# Test attachment values are read from both resourceLinks shapes
+def test_rank_contracts_reads_attachment_links(monkeypatch, make_notice):
+    values = {
+        'https://sam.gov/api/prod/opps/v3/opportunities/resources/files/1/download': 300000.0,
+        'https://sam.gov/api/prod/opps/v3/opportunities/resources/files/2/download': 200000.0,
+    }
+    monkeypatch.setattr(contract_tweets, 'extract_value_from_pdf', values.get)
+    notices = [
+        make_notice(noticeId='valued'),
+        make_notice(noticeId='strings', award=None, resourceLinks=list(values)[:1]),
+        make_notice(noticeId='dicts', award=None, resourceLinks=[{'url': list(values)[1]}]),
+        make_notice(noticeId='null', award=None, resourceLinks=None),
+        make_notice(noticeId='bad', award=None, resourceLinks=[42]),
+    ]
+    ranked = {contract['id']: contract['value_raw'] for contract in rank_contracts(notices, NOW)}
+    assert ranked == {'valued': 250000.0, 'strings': 300000.0, 'dicts': 200000.0, 'null': 0, 'bad': 0}
+
+# Test deadlines are shown in UTC and expired notices are dropped
+def test_rank_contracts_converts_deadlines_to_utc(make_notice):
+    notices = [
+        make_notice(noticeId='local', responseDeadLine='2026-11-01T17:00:00-04:00'),
+        make_notice(noticeId='utc', responseDeadLine='2026-11-02T17:00:00+00:00'),
+        make_notice(noticeId='naive', responseDeadLine='2026-11-03T17:00:00'),
+        make_notice(noticeId='expired', responseDeadLine='2026-10-13T17:00:00-04:00'),
+    ]
+    ranked = {contract['id']: contract['deadline'] for contract in rank_contracts(notices, NOW)}
+    assert ranked == {
+        'local': 'November 01, 2026, 09:00 PM UTC',
+        'utc': 'November 02, 2026, 05:00 PM UTC',
+        'naive': 'November 03, 2026, 05:00 PM UTC',
+    }
+
+# Test the agency is the last segment of the parent path
+def test_rank_contracts_agency_fallback(make_notice):
+    notices = [
+        make_notice(noticeId='path'),
+        make_notice(noticeId='empty', fullParentPathName=''),
+        make_notice(noticeId='missing'),
+    ]
+    del notices[2]['fullParentPathName']
+    ranked = {contract['id']: contract for contract in rank_contracts(notices, NOW)}
+    assert ranked['path']['agency'] == 'PUBLIC BUILDINGS SERVICE'
+    for notice_id in ('empty', 'missing'):
+        assert ranked[notice_id]['agency'] == 'Federal Government'
+        assert 'agency' in ranked[notice_id]['missing_fields']
+
+# Test only the top 5 are returned and incomplete records don't crash ranking
+def test_rank_contracts_returns_top_five(make_notice):
+    notices = [make_notice(noticeId=str(i), award={'amount': str(i * 100000)}) for i in range(1, 8)]
+    ranked = rank_contracts(notices, NOW)
+    assert [contract['id'] for contract in ranked] == ['7', '6', '5', '4', '3']
+
+def test_rank_contracts_handles_missing_value_and_title(make_notice):
+    untitled = make_notice(noticeId='untitled')
+    del untitled['title']
+    ranked = rank_contracts([make_notice(noticeId='novalue', award=None), untitled], NOW)
+    assert [contract['id'] for contract in ranked] == ['novalue']
+    assert ranked[0]['value_raw'] == 0
+    assert 'contract_value' in ranked[0]['missing_fields']